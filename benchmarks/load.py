@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import collections
+import dataclasses
+import inspect
+import random
+import time
+import typing
+
+import zorge
+
+_SCOPES = ('container', 'resolver', None)
+
+
+@dataclasses.dataclass
+class Node:
+    contract: type
+    dependencies: dict[str, typing.Any]
+
+
+@dataclasses.dataclass
+class Registry:
+    container: zorge.Container
+    roots: list[type]
+    scopes: dict[type, str | None]
+    constructions: collections.Counter
+
+
+@dataclasses.dataclass
+class Phase:
+    name: str
+    latencies: list[int] = dataclasses.field(default_factory=list)
+
+    def report(self, duration: float) -> str:
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return f'{self.name:12} no samples'
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] / 1000
+
+        return (
+            f'{self.name:12} {len(latencies) / duration:12.0f}/s'
+            f'  p50 {percentile(0.5):9.1f}us'
+            f'  p99 {percentile(0.99):9.1f}us'
+            f'  p999 {percentile(0.999):9.1f}us'
+            f'  max {latencies[-1] / 1000:9.1f}us'
+        )
+
+
+def _make_factory(
+    contract: type,
+    dependencies: dict[str, type],
+    is_async: bool,
+    io_delay: float,
+    constructions: collections.Counter
+) -> typing.Callable:
+    if is_async:
+        async def factory(**kwargs):
+            constructions[contract] += 1
+            await asyncio.sleep(io_delay)
+            return Node(contract, kwargs)
+    else:
+        def factory(**kwargs):
+            constructions[contract] += 1
+            return Node(contract, kwargs)
+
+    factory.__signature__ = inspect.Signature(
+        [
+            inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, annotation=dependency)
+            for name, dependency in dependencies.items()
+        ],
+        return_annotation=contract
+    )
+    return factory
+
+
+def build_registry(
+    depth: int,
+    width: int,
+    fan_in: int,
+    async_ratio: float,
+    scope_mix: tuple[float, float, float],
+    io_delay: float = 0.0,
+    thread_safe: bool = False,
+    seed: int | None = None
+) -> Registry:
+    rng = random.Random(seed)
+    container = zorge.Container(thread_safe=thread_safe)
+    constructions = collections.Counter()
+    scopes = {}
+    layers = [[type(f'Contract{level}x{index}', (), {}) for index in range(width)] for level in range(depth)]
+    for level, layer in enumerate(layers):
+        for contract in layer:
+            dependencies = {}
+            if level + 1 < depth:
+                for dependency in rng.sample(layers[level + 1], min(fan_in, width)):
+                    dependencies[f'dependency_{dependency.__name__.lower()}'] = dependency
+            scopes[contract] = rng.choices(_SCOPES, weights=scope_mix)[0]
+            container.register_dependency(
+                implementation=_make_factory(
+                    contract, dependencies, rng.random() < async_ratio, io_delay, constructions
+                ),
+                contract=contract,
+                cache_scope=scopes[contract]
+            )
+    return Registry(container=container, roots=layers[0], scopes=scopes, constructions=constructions)
+
+
+async def _worker(
+    registry: Registry,
+    phases: dict[str, Phase],
+    deadline: float,
+    seed: int
+):
+    rng = random.Random(seed)
+    clock = time.perf_counter_ns
+    while time.perf_counter() < deadline:
+        started = clock()
+        resolver = registry.container.get_resolver()
+        resolved = clock()
+        await resolver.resolve(rng.choice(registry.roots))
+        shut = clock()
+        await resolver.shutdown()
+        finished = clock()
+        phases['get_resolver'].latencies.append(resolved - started)
+        phases['resolve'].latencies.append(shut - resolved)
+        phases['shutdown'].latencies.append(finished - shut)
+        phases['total'].latencies.append(finished - started)
+
+
+async def run(
+    registry: Registry,
+    tasks: int,
+    duration: float,
+    seed: int | None = None
+) -> dict[str, Phase]:
+    phases = {name: Phase(name) for name in ('get_resolver', 'resolve', 'shutdown', 'total')}
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(_worker(registry, phases, deadline, rng.getrandbits(32)) for _ in range(tasks)))
+    return phases
+
+
+def _report_contention(registry: Registry) -> list[str]:
+    container_scoped = [contract for contract, scope in registry.scopes.items() if scope == 'container']
+    constructed = [contract for contract in container_scoped if registry.constructions[contract]]
+    duplicates = sum(registry.constructions[contract] - 1 for contract in constructed)
+    return [
+        f'container scoped units: {len(container_scoped)}, constructed: {len(constructed)}',
+        f'duplicate singleton constructions (cache races): {duplicates}',
+        f'total constructions: {sum(registry.constructions.values())}',
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent load test of resolver throughput and tail latency')
+    parser.add_argument('--tasks', type=int, default=1000, help='concurrent asyncio tasks')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds to drive the load')
+    parser.add_argument('--depth', type=int, default=4, help='layers in the dependency graph')
+    parser.add_argument('--width', type=int, default=8, help='contracts per layer')
+    parser.add_argument('--fan-in', type=int, default=3, help='dependencies per unit')
+    parser.add_argument('--async-ratio', type=float, default=0.3, help='share of async factories')
+    parser.add_argument(
+        '--scope-mix',
+        type=float,
+        nargs=3,
+        default=(0.3, 0.5, 0.2),
+        metavar=('CONTAINER', 'RESOLVER', 'NONE'),
+        help='weights of cache scopes'
+    )
+    parser.add_argument('--io-delay', type=float, default=0.0, help='seconds each async factory sleeps')
+    parser.add_argument('--thread-safe', action='store_true', help='use a thread-safe container')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    registry = build_registry(
+        depth=args.depth,
+        width=args.width,
+        fan_in=args.fan_in,
+        async_ratio=args.async_ratio,
+        scope_mix=tuple(args.scope_mix),
+        io_delay=args.io_delay,
+        thread_safe=args.thread_safe,
+        seed=args.seed
+    )
+    started = time.perf_counter()
+    phases = asyncio.run(run(registry, args.tasks, args.duration, args.seed))
+    elapsed = time.perf_counter() - started
+
+    print(f'{args.tasks} tasks for {elapsed:.2f}s, graph {args.depth}x{args.width} fan-in {args.fan_in}')
+    for phase in phases.values():
+        print(phase.report(elapsed))
+    for line in _report_contention(registry):
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
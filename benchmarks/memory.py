@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import gc
+import tracemalloc
+import typing
+
+import zorge
+
+
+def _build_graph(units: int) -> list[tuple[type, type]]:
+    graph = []
+    previous = None
+    for index in range(units):
+        contract = type(f'Contract{index}', (), {})
+        if previous is None:
+            def __init__(self):
+                pass
+        else:
+            def __init__(self, dependency: previous):
+                self.dependency = dependency
+        graph.append((contract, type(f'Implementation{index}', (contract,), {'__init__': __init__})))
+        previous = contract
+    return graph
+
+
+def _build_container(graph: list[tuple[type, type]]) -> zorge.Container:
+    container = zorge.Container()
+    for index, (contract, implementation) in enumerate(graph):
+        container.register_dependency(
+            implementation=implementation,
+            contract=contract,
+            cache_scope='resolver' if index % 2 else 'container'
+        )
+    return container
+
+
+def _measure(action: typing.Callable[[], typing.Any]) -> tuple[int, typing.Any]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = action()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+async def _resolve_all(resolvers: list[zorge.Resolver], contract: type):
+    for resolver in resolvers:
+        await resolver.resolve(contract)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory footprint of container units and resolvers')
+    parser.add_argument('--units', type=int, default=1000)
+    parser.add_argument('--resolvers', type=int, default=10000)
+    args = parser.parse_args()
+
+    graph = _build_graph(args.units)
+    contracts = [contract for contract, _ in graph]
+    size, container = _measure(lambda: _build_container(graph))
+    print(f'registered unit:     {size / args.units:10.1f} bytes ({args.units} units)')
+
+    size, resolvers = _measure(lambda: [container.get_resolver() for _ in range(args.resolvers)])
+    print(f'idle resolver:       {size / args.resolvers:10.1f} bytes ({args.resolvers} resolvers)')
+
+    # Warm the container scoped part of the graph so resolvers only pay for their own cache
+    asyncio.run(_resolve_all(resolvers[:1], contracts[0]))
+    size, _ = _measure(lambda: asyncio.run(_resolve_all(resolvers, contracts[0])))
+    print(f'resolve (cache hit): {size / args.resolvers:10.1f} bytes per resolver')
+
+    size, resolvers = _measure(lambda: [container.get_resolver() for _ in range(args.resolvers)])
+    size, _ = _measure(lambda: asyncio.run(_resolve_all(resolvers, contracts[1])))
+    print(f'resolve (scoped):    {size / args.resolvers:10.1f} bytes per resolver')
+
+
+if __name__ == '__main__':
+    main()
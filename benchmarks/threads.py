@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import zorge
+
+
+class EngineContract:
+    pass
+
+
+class ConnectionContract:
+    pass
+
+
+class RepositoryContract:
+    pass
+
+
+class Engine(EngineContract):
+    constructed = 0
+    _lock = threading.Lock()
+
+    def __init__(self):
+        with self._lock:
+            Engine.constructed += 1
+
+
+class Connection(ConnectionContract):
+    def __init__(self, engine: EngineContract):
+        self.engine = engine
+
+
+class Repository(RepositoryContract):
+    def __init__(self, connection: ConnectionContract):
+        self.connection = connection
+
+
+def _build_container(thread_safe: bool) -> zorge.Container:
+    container = zorge.Container(thread_safe=thread_safe)
+    container.register_dependency(Engine, cache_scope='container')
+    container.register_dependency(Connection, cache_scope='resolver')
+    container.register_dependency(Repository, cache_scope='resolver')
+    return container
+
+
+async def _worker(container: zorge.Container, iterations: int):
+    for _ in range(iterations):
+        async with container.get_resolver() as resolver:
+            await resolver.resolve(RepositoryContract)
+
+
+def _run(threads: int, iterations: int, thread_safe: bool) -> float:
+    container = _build_container(thread_safe)
+    barrier = threading.Barrier(threads)
+
+    def target():
+        barrier.wait()
+        asyncio.run(_worker(container, iterations))
+
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        for future in [executor.submit(target) for _ in range(threads)]:
+            future.result()
+    return threads * iterations / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Multi-threaded resolver throughput')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    for thread_safe in (False, True):
+        for threads in args.threads:
+            Engine.constructed = 0
+            throughput = _run(threads, args.iterations, thread_safe)
+            print(
+                f'thread_safe={thread_safe!s:5} threads={threads:3} '
+                f'{throughput:12.0f} resolves/s  singleton constructed {Engine.constructed}x'
+            )
+
+
+if __name__ == '__main__':
+    main()
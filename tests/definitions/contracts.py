@@ -39,3 +39,11 @@ class UnitOfWorkContract:
 @dataclasses.dataclass
 class UserContextContract:
     user_id: int
+
+
+class PluginContract(typing.Protocol):
+    def name(self) -> str: ...
+
+
+class PluginChainContract(typing.Protocol):
+    def names(self) -> list[str]: ...
@@ -10,7 +10,8 @@ from .contracts import (
     UserActorContract,
     PostActorContract,
     UserContextContract,
-    PoolSizeContract
+    PoolSizeContract,
+    PluginContract
 )
 
 
@@ -23,10 +24,31 @@ async def async_engine() -> str:
     return 'postgresql'
 
 
+def sync_engine_resource() -> collections.abc.Iterator[DBEngineContract]:
+    engine = Resource('postgresql')
+    yield engine
+    engine.closed = True
+
+
+async def async_engine_resource() -> collections.abc.AsyncIterator[DBEngineContract]:
+    engine = Resource('postgresql')
+    yield engine
+    engine.closed = True
+
+
 async def close_connection(connection: DBConnectionContract, context: collections.abc.Mapping):
     connection.register_connection_closed(1)
 
 
+class Resource:
+    def __init__(self, name: str):
+        self.name = name
+        self.closed = False
+
+    def __str__(self):
+        return self.name
+
+
 class DBConnection:
     def __init__(self, db_engine: DBEngineContract):
         self._db_engine = db_engine
@@ -98,3 +120,30 @@ class UserService:
 
     def get_ids(self) -> list[int]:
         return [self.user_id, self.post_id, self.pool_size]
+
+
+class AuthPlugin:
+    def name(self) -> str:
+        return 'auth'
+
+
+class CachePlugin:
+    def __init__(self, db_engine: DBEngineContract):
+        self._db_engine = db_engine
+
+    def name(self) -> str:
+        return f'cache with {self._db_engine}'
+
+
+async def metrics_plugin() -> PluginContract:
+    await asyncio.sleep(0.1)
+    return AuthPlugin()
+
+
+class PluginChain:
+    def __init__(self, plugins: list[PluginContract], handlers: dict[str, PluginContract]):
+        self.plugins = plugins
+        self.handlers = handlers
+
+    def names(self) -> list[str]:
+        return [plugin.name() for plugin in self.plugins]
@@ -58,3 +58,73 @@ def test_class_dependency_adding(container: zorge.Container):
     assert type(unit.init_signature) is zorge.definition.contracts.FunctionSignature
     assert unit.init_signature.parameters['db_engine'].type == contracts.DBEngineContract
     assert unit.implementation is implementations.DBConnection
+
+
+def test_compact_representation(container: zorge.Container):
+    container.register_dependency(
+        contract=contracts.DBConnectionContract,
+        implementation=implementations.DBConnection,
+        cache_scope='resolver'
+    )
+
+    unit = next(iter(container))
+    resolver = container.get_resolver()
+    assert not hasattr(unit, '__dict__')
+    assert not hasattr(unit.init_signature.parameters['db_engine'], '__dict__')
+    assert not hasattr(resolver, '__dict__')
+
+
+def test_multiple_dependency_adding(container: zorge.Container):
+    container.register_dependency(
+        contract=contracts.PluginContract,
+        implementation=implementations.AuthPlugin,
+        multiple=True
+    )
+    other = zorge.Container()
+    other.register_dependency(
+        contract=contracts.PluginContract,
+        implementation=implementations.CachePlugin,
+        multiple=True,
+        key='cache'
+    )
+    container += other
+
+    unit = next(iter(container))
+    assert unit.implementation_kind == zorge.definition.contracts.ImplementationKind.COLLECTION
+    assert isinstance(unit.members[0].key, zorge.definition.contracts.MemberIndex)
+    assert unit.members[1].key == 'cache'
+    assert [member.implementation for member in unit.members] == [
+        implementations.AuthPlugin,
+        implementations.CachePlugin
+    ]
+
+
+def test_unkeyed_multiple_dependency_merging(container: zorge.Container):
+    container.register_dependency(
+        contract=contracts.PluginContract,
+        implementation=implementations.AuthPlugin,
+        multiple=True
+    )
+    container.register_dependency(
+        contract=contracts.PluginContract,
+        implementation=implementations.metrics_plugin,
+        multiple=True,
+        key=1
+    )
+    other = zorge.Container()
+    other.register_dependency(
+        contract=contracts.PluginContract,
+        implementation=implementations.CachePlugin,
+        multiple=True
+    )
+    other_member = next(iter(other)).members[0]
+    other_key = other_member.key
+    container += other
+
+    unit = next(iter(container))
+    assert [member.implementation for member in unit.members] == [
+        implementations.AuthPlugin,
+        implementations.metrics_plugin,
+        implementations.CachePlugin
+    ]
+    assert other_member.key is other_key
@@ -1,3 +1,10 @@
+import asyncio
+import collections.abc
+import concurrent.futures
+import gc
+import time
+import weakref
+
 import pytest
 
 import zorge
@@ -133,3 +140,511 @@ async def test_resolver_context(container: zorge.Container):
     ) as resolver:
         service = await resolver.resolve(contracts.UserServiceContract)
         assert service.get_ids() == [1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_generator_resolver_teardown(container: zorge.Container):
+    container.register_dependency(
+        implementation=implementations.sync_engine_resource,
+        cache_scope='resolver'
+    )
+    container.register_dependency(
+        contract=contracts.DBConnectionContract,
+        implementation=implementations.DBConnection,
+        cache_scope='resolver'
+    )
+
+    async with container.get_resolver() as resolver:
+        connection = await resolver.resolve(contracts.DBConnectionContract)
+        engine = await resolver.resolve(contracts.DBEngineContract)
+        assert str(connection) == 'Connection with postgresql'
+        assert engine.closed is False
+
+    assert engine.closed is True
+
+
+@pytest.mark.asyncio
+async def test_async_generator_container_teardown(container: zorge.Container):
+    container.register_dependency(
+        implementation=implementations.async_engine_resource,
+        cache_scope='container'
+    )
+
+    async with container:
+        async with container.get_resolver() as resolver:
+            engine = await resolver.resolve(contracts.DBEngineContract)
+        assert engine.closed is False
+
+    assert engine.closed is True
+
+
+@pytest.mark.asyncio
+async def test_teardown_order(container: zorge.Container):
+    closed = []
+
+    def engine() -> collections.abc.Iterator[contracts.DBEngineContract]:
+        yield 'postgresql'
+        closed.append('engine')
+
+    async def connection(db_engine: contracts.DBEngineContract) -> collections.abc.AsyncIterator[contracts.DBConnectionContract]:
+        yield implementations.DBConnection(db_engine)
+        closed.append('connection')
+
+    container.register_dependency(engine, cache_scope='resolver')
+    container.register_dependency(connection, cache_scope='resolver')
+
+    async with container.get_resolver() as resolver:
+        await resolver.resolve(contracts.DBConnectionContract)
+
+    assert closed == ['connection', 'engine']
+
+
+@pytest.mark.asyncio
+async def test_none_result_is_cached(container: zorge.Container):
+    calls = []
+
+    def engine() -> contracts.DBEngineContract:
+        calls.append(1)
+
+    container.register_dependency(engine, cache_scope='resolver')
+
+    async with container.get_resolver() as resolver:
+        assert await resolver.resolve(contracts.DBEngineContract) is None
+        assert await resolver.resolve(contracts.DBEngineContract) is None
+
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_unregistered_contract_lookup(container: zorge.Container):
+    async with container.get_resolver() as resolver:
+        assert await resolver.resolve(contracts.DBEngineContract) is None
+
+    container.register_dependency(
+        contract=contracts.DBEngineContract,
+        implementation=implementations.sync_engine
+    )
+
+    async with container.get_resolver() as resolver:
+        assert await resolver.resolve(contracts.DBEngineContract) == 'postgresql'
+
+
+@pytest.mark.asyncio
+async def test_multiple_dependencies(container: zorge.Container):
+    container.register_dependency(
+        contract=contracts.DBEngineContract,
+        implementation=implementations.sync_engine,
+        cache_scope='container'
+    )
+    container.register_dependency(
+        contract=contracts.PluginContract,
+        implementation=implementations.AuthPlugin,
+        multiple=True,
+        key='auth'
+    )
+    container.register_dependency(
+        contract=contracts.PluginContract,
+        implementation=implementations.CachePlugin,
+        cache_scope='resolver',
+        multiple=True,
+        key='cache'
+    )
+    container.register_dependency(
+        contract=contracts.PluginChainContract,
+        implementation=implementations.PluginChain,
+        cache_scope='resolver'
+    )
+
+    async with container.get_resolver() as resolver:
+        chain = await resolver.resolve(contracts.PluginChainContract)
+        assert chain.names() == ['auth', 'cache with postgresql']
+        assert list(chain.handlers) == ['auth', 'cache']
+        assert chain.handlers['cache'] is chain.plugins[1]
+        assert chain.handlers['auth'] is not chain.plugins[0]
+        assert [plugin.name() for plugin in await resolver.resolve(list[contracts.PluginContract])] == [
+            'auth', 'cache with postgresql'
+        ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_multiple_dependencies(container: zorge.Container):
+    for _ in range(3):
+        container.register_dependency(
+            contract=contracts.PluginContract,
+            implementation=implementations.metrics_plugin,
+            multiple=True,
+            concurrent=True
+        )
+
+    async with container.get_resolver() as resolver:
+        started = asyncio.get_running_loop().time()
+        plugins = await resolver.resolve(dict[int, contracts.PluginContract])
+        assert asyncio.get_running_loop().time() - started < 0.2
+        assert list(plugins) == [0, 1, 2]
+        assert await resolver.resolve(list[contracts.UserActorContract]) == []
+
+
+@pytest.mark.asyncio
+async def test_thread_safe_container_scope():
+    container = zorge.Container(thread_safe=True)
+    calls = []
+
+    def engine() -> contracts.DBEngineContract:
+        calls.append(1)
+        time.sleep(0.05)
+        return 'postgresql'
+
+    async def slow_engine() -> contracts.DBEngineContract:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'postgresql'
+
+    async def resolve():
+        async with container.get_resolver() as resolver:
+            return await resolver.resolve(contracts.DBEngineContract)
+
+    container.register_dependency(engine, cache_scope='container')
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: asyncio.run(resolve()), range(8)))
+    assert results == ['postgresql'] * 8
+    assert len(calls) == 1
+
+    container = zorge.Container(thread_safe=True)
+    container.register_dependency(slow_engine, cache_scope='container')
+    assert await asyncio.gather(*(resolve() for _ in range(8))) == ['postgresql'] * 8
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_reregistration_invalidation(container: zorge.Container):
+    container.register_dependency(implementations.sync_engine_resource, cache_scope='container')
+    container.register_dependency(
+        contract=contracts.DBConnectionContract,
+        implementation=implementations.DBConnection,
+        cache_scope='container'
+    )
+    container.register_dependency(
+        contract=contracts.PoolSizeContract,
+        implementation=5,
+        cache_scope='container'
+    )
+
+    async with container.get_resolver() as resolver:
+        connection = await resolver.resolve(contracts.DBConnectionContract)
+        engine = await resolver.resolve(contracts.DBEngineContract)
+        await resolver.resolve(contracts.PoolSizeContract)
+
+    container.register_dependency(implementations.async_engine_resource, cache_scope='container')
+    await container.dispose_stale()
+    assert engine.closed is True
+
+    async with container:
+        async with container.get_resolver() as resolver:
+            assert await resolver.resolve(contracts.DBConnectionContract) is not connection
+            new_engine = await resolver.resolve(contracts.DBEngineContract)
+            assert new_engine is not engine
+            assert await resolver.resolve(contracts.PoolSizeContract) == 5
+        assert new_engine.closed is False
+
+    assert new_engine.closed is True
+
+
+@pytest.mark.asyncio
+async def test_disposed_resources_are_released(container: zorge.Container):
+    container.register_dependency(implementations.sync_engine_resource, cache_scope='container')
+    async with container.get_resolver() as resolver:
+        engine = weakref.ref(await resolver.resolve(contracts.DBEngineContract))
+    exit_stacks = [weakref.ref(exit_stack) for exit_stack in container._teardown._keyed_exit_stacks.values()]
+
+    container.register_dependency(implementations.sync_engine_resource, cache_scope='container')
+    await container.dispose_stale()
+    gc.collect()
+    assert engine() is None
+    assert [exit_stack() for exit_stack in exit_stacks] == [None]
+
+    async with container:
+        async with container.get_resolver() as resolver:
+            new_engine = await resolver.resolve(contracts.DBEngineContract)
+        container.register_dependency(implementations.sync_engine_resource, cache_scope='container')
+    assert new_engine.closed is True
+
+
+@pytest.mark.asyncio
+async def test_lazy_registration(container: zorge.Container):
+    container.register_dependency(
+        'tests.definitions.implementations:sync_engine_resource',
+        contract=contracts.DBEngineContract,
+        cache_scope='container',
+        lazy=True
+    )
+    container.register_dependency(
+        'tests.definitions.implementations:DBConnection',
+        contract=contracts.DBConnectionContract,
+        cache_scope='resolver',
+        lazy=True
+    )
+    container.register_dependency(
+        'tests.definitions.implementations:AuthPlugin',
+        contract=contracts.PluginContract,
+        multiple=True,
+        lazy=True
+    )
+    container.register_dependency(
+        'tests.definitions.implementations:UnitOfWork',
+        contract=contracts.UnitOfWorkContract,
+        lazy=True
+    )
+    container.register_dependency('redis:cache', contract=contracts.PoolSizeContract)
+
+    assert len(container.unmaterialized()) == 4
+
+    async with container.get_resolver() as resolver:
+        connection = await resolver.resolve(contracts.DBConnectionContract)
+        assert str(connection) == 'Connection with postgresql'
+        assert [plugin.name() for plugin in await resolver.resolve(list[contracts.PluginContract])] == ['auth']
+        assert await resolver.resolve(contracts.PoolSizeContract) == 'redis:cache'
+
+    assert container.unmaterialized() == ['tests.definitions.implementations:UnitOfWork']
+
+
+@pytest.mark.asyncio
+async def test_lazy_registration_import_error(container: zorge.Container):
+    container.register_dependency(
+        'tests.definitions.implementations:MissingConnection',
+        contract=contracts.DBConnectionContract,
+        lazy=True
+    )
+
+    async with container.get_resolver() as resolver:
+        with pytest.raises(zorge.exceptions.CannotImportImplementation):
+            await resolver.resolve(contracts.DBConnectionContract)
+
+
+@pytest.mark.asyncio
+async def test_callback_skips_unscoped_instances(container: zorge.Container):
+    container.register_dependency(
+        contract=contracts.DBEngineContract,
+        implementation=implementations.sync_engine
+    )
+    container.register_dependency(
+        contract=contracts.DBConnectionContract,
+        implementation=implementations.DBConnection
+    )
+    container.register_callback(
+        contract=contracts.DBConnectionContract,
+        callback=implementations.close_connection
+    )
+
+    async with container.get_resolver() as resolver:
+        connection = await resolver.resolve(contracts.DBConnectionContract)
+
+    assert connection.sentinel is None
+
+
+@pytest.mark.asyncio
+async def test_generic_alias_single_binding(container: zorge.Container):
+    def hosts() -> list[str]:
+        return ['primary', 'replica']
+
+    def pool(hosts: list[str]) -> contracts.PoolSizeContract:
+        return len(hosts)
+
+    container.register_dependency(hosts)
+    container.register_dependency(pool)
+
+    async with container.get_resolver() as resolver:
+        assert await resolver.resolve(list[str]) == ['primary', 'replica']
+        assert await resolver.resolve(contracts.PoolSizeContract) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_members_share_scoped_dependencies(container: zorge.Container):
+    calls = []
+
+    async def engine() -> collections.abc.AsyncIterator[contracts.DBEngineContract]:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        yield implementations.Resource('postgresql')
+
+    container.register_dependency(engine, cache_scope='resolver')
+    for _ in range(3):
+        container.register_dependency(
+            contract=contracts.PluginContract,
+            implementation=implementations.CachePlugin,
+            multiple=True,
+            concurrent=True
+        )
+
+    async with container.get_resolver() as resolver:
+        plugins = await resolver.resolve(list[contracts.PluginContract])
+        assert [plugin.name() for plugin in plugins] == ['cache with postgresql'] * 3
+
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_ambiguous_union_parameter(container: zorge.Container):
+    def pool(size: int | str) -> contracts.PoolSizeContract:
+        return int(size)
+
+    container.register_dependency(pool)
+
+    async with container.get_resolver() as resolver:
+        assert await resolver.resolve(contracts.PoolSizeContract, {'size': '3'}) == 3
+        with pytest.raises(Exception, match='Cannot resolve more than 1 contract'):
+            await resolver.resolve(contracts.PoolSizeContract)
+
+
+@pytest.mark.asyncio
+async def test_reregistration_drops_stale_dependencies(container: zorge.Container):
+    def service(pool_size: contracts.PoolSizeContract) -> contracts.UserServiceContract:
+        return object()
+
+    def other_service(engine: contracts.DBEngineContract) -> contracts.UserServiceContract:
+        return object()
+
+    container.register_dependency(contract=contracts.PoolSizeContract, implementation=1)
+    container.register_dependency(implementations.sync_engine, contract=contracts.DBEngineContract)
+    container.register_dependency(service, cache_scope='container')
+    container.register_dependency(other_service, cache_scope='container')
+
+    async with container.get_resolver() as resolver:
+        instance = await resolver.resolve(contracts.UserServiceContract)
+
+    container.register_dependency(contract=contracts.PoolSizeContract, implementation=2)
+
+    async with container.get_resolver() as resolver:
+        assert await resolver.resolve(contracts.UserServiceContract) is instance
+
+
+@pytest.mark.asyncio
+async def test_reregistration_during_construction():
+    container = zorge.Container(thread_safe=True)
+    started = asyncio.Event()
+
+    async def slow_engine() -> contracts.DBEngineContract:
+        started.set()
+        await asyncio.sleep(0.05)
+        return 'stale'
+
+    def engine() -> contracts.DBEngineContract:
+        return 'fresh'
+
+    container.register_dependency(slow_engine, cache_scope='container')
+
+    async def resolve():
+        async with container.get_resolver() as resolver:
+            return await resolver.resolve(contracts.DBEngineContract)
+
+    in_flight = asyncio.create_task(resolve())
+    await started.wait()
+    container.register_dependency(engine, cache_scope='container')
+    assert await in_flight == 'stale'
+    assert await resolve() == 'fresh'
+
+
+@pytest.mark.asyncio
+async def test_lazy_dependency_keeps_dependent_singleton():
+    container = zorge.Container(thread_safe=True)
+    constructed = []
+
+    def connection(db_engine: contracts.DBEngineContract) -> contracts.DBConnectionContract:
+        constructed.append(db_engine)
+        return implementations.DBConnection(db_engine)
+
+    container.register_dependency(
+        'tests.definitions.implementations:sync_engine_resource',
+        contract=contracts.DBEngineContract,
+        cache_scope='container',
+        lazy=True
+    )
+    container.register_dependency(connection, cache_scope='container')
+
+    async with container.get_resolver() as resolver:
+        first = await resolver.resolve(contracts.DBConnectionContract)
+    async with container.get_resolver() as resolver:
+        assert await resolver.resolve(contracts.DBConnectionContract) is first
+
+    assert len(constructed) == 1
+
+
+@pytest.mark.asyncio
+async def test_lazy_registration_without_loader(container: zorge.Container):
+    container.register_dependency(
+        'tests.definitions.implementations:AuthPlugin',
+        contract=contracts.PluginContract,
+        multiple=True,
+        lazy=True
+    )
+
+    resolver = zorge.Resolver(container._unit_registry)
+    with pytest.raises(zorge.exceptions.CannotImportImplementation):
+        await resolver.resolve(list[contracts.PluginContract])
+
+
+def test_lazy_registration_requires_contract(container: zorge.Container):
+    with pytest.raises(zorge.exceptions.CannotAutomaticallyDeriveContract):
+        container.register_dependency('tests.definitions.implementations:sync_engine_resource', lazy=True)
+
+
+@pytest.mark.asyncio
+async def test_lazy_registration_order(container: zorge.Container):
+    def engine() -> contracts.DBEngineContract:
+        return 'eager'
+
+    lazy_engine = 'tests.definitions.implementations:sync_engine_resource'
+    container.register_dependency(lazy_engine, contract=contracts.DBEngineContract, lazy=True)
+    container.register_dependency(engine)
+
+    async with container.get_resolver() as resolver:
+        assert await resolver.resolve(contracts.DBEngineContract) == 'eager'
+
+    container.register_dependency(lazy_engine, contract=contracts.DBEngineContract, lazy=True)
+
+    async with container.get_resolver() as resolver:
+        assert str(await resolver.resolve(contracts.DBEngineContract)) == 'postgresql'
+
+
+@pytest.mark.asyncio
+async def test_reregistration_during_construction_default_mode(container: zorge.Container):
+    started = asyncio.Event()
+
+    async def slow_engine() -> contracts.DBEngineContract:
+        started.set()
+        await asyncio.sleep(0.05)
+        return 'stale'
+
+    def engine() -> contracts.DBEngineContract:
+        return 'fresh'
+
+    container.register_dependency(slow_engine, cache_scope='container')
+
+    async def resolve():
+        async with container.get_resolver() as resolver:
+            return await resolver.resolve(contracts.DBEngineContract)
+
+    in_flight = asyncio.create_task(resolve())
+    await started.wait()
+    container.register_dependency(engine, cache_scope='container')
+    assert await in_flight == 'stale'
+    assert await resolve() == 'fresh'
+
+
+@pytest.mark.asyncio
+async def test_multiple_dependencies_key_conflict(container: zorge.Container):
+    container.register_dependency(
+        contract=contracts.PluginContract,
+        implementation=implementations.AuthPlugin,
+        multiple=True
+    )
+    container.register_dependency(
+        contract=contracts.PluginContract,
+        implementation=implementations.AuthPlugin,
+        multiple=True,
+        key=0
+    )
+
+    async with container.get_resolver() as resolver:
+        assert len(await resolver.resolve(list[contracts.PluginContract])) == 2
+        with pytest.raises(zorge.exceptions.CollectionKeyConflict):
+            await resolver.resolve(dict[int, contracts.PluginContract])
@@ -1,6 +1,8 @@
+import builtins
 import dataclasses
 import typing
 import enum
+import threading
 import collections.abc
 
 ContractType: typing.TypeAlias = type
@@ -24,13 +26,18 @@ class CacheScope(enum.Enum):
 class UnitKeyKind(enum.Enum):
     DEPENDENCY = enum.auto()
     CALLBACK = enum.auto()
+    COLLECTION = enum.auto()
+    MEMBER = enum.auto()
 
 
 class ImplementationKind(enum.Enum):
     CALLABLE = enum.auto()
+    GENERATOR = enum.auto()
     CLASS = enum.auto()
     STATIC = enum.auto()
     CALLBACK = enum.auto()
+    COLLECTION = enum.auto()
+    LAZY = enum.auto()
 
 
 class ImplementationExecutionType(enum.Enum):
@@ -38,26 +45,35 @@ class ImplementationExecutionType(enum.Enum):
     ASYNC = enum.auto()
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class UnitKey:
     kind: UnitKeyKind
     contract: ContractType | None
+    key: typing.Hashable | None = None
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, slots=True)
+class MemberIndex:
+    value: int
+
+
+@dataclasses.dataclass(slots=True)
 class FunctionParameter:
     name: str
     type: type
     default: typing.Any | None
+    contract: ContractType | None = None
+    member: ContractType | None = None
+    collection: builtins.type[list] | builtins.type[dict] | None = None
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class FunctionSignature:
     parameters: collections.abc.Mapping[str, FunctionParameter]
     result: type
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class ContainerUnit:
     contract: ContractType
     implementation: ImplementationType
@@ -67,7 +83,22 @@ class ContainerUnit:
     cache_scope: CacheScope | None = None
     init_signature: FunctionSignature | None = None
     execution_signature: FunctionSignature | None = None
+    key: typing.Hashable | None = None
+    members: tuple['ContainerUnit', ...] = ()
+    concurrent: bool = False
 
 
 ContainerUnitRegistry: typing.TypeAlias = collections.abc.MutableMapping[UnitKey, ContainerUnit]
-InstanceCacheType: typing.TypeAlias = collections.abc.MutableMapping[ContractType, InstanceType]
+InstanceCacheType: typing.TypeAlias = collections.abc.MutableMapping[typing.Hashable, InstanceType]
+ContractSetType: typing.TypeAlias = collections.abc.MutableSet[ContractType]
+DependentsRegistryType: typing.TypeAlias = collections.abc.MutableMapping[
+    typing.Hashable,
+    collections.abc.MutableSet[typing.Hashable]
+]
+DependenciesRegistryType: typing.TypeAlias = collections.abc.MutableMapping[
+    typing.Hashable,
+    collections.abc.Set[ContractType]
+]
+GenerationRegistryType: typing.TypeAlias = collections.abc.Mapping[typing.Hashable, int]
+ConstructionLockRegistryType: typing.TypeAlias = collections.abc.MutableMapping[typing.Hashable, threading.Lock]
+UnitLoaderType: typing.TypeAlias = collections.abc.Callable[[UnitKey], ContainerUnit | None]
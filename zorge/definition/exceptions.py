@@ -2,7 +2,7 @@ import abc
 
 
 class DIException(Exception):
-    def __init__(self, contract: type):
+    def __init__(self, contract: type | str):
         self.contract = contract
         super().__init__(self.message())
 
@@ -12,7 +12,7 @@ class DIException(Exception):
 
 
 class UnsupportedTrigger(DIException):
-    def __init__(self, contract: type, trigger: str):
+    def __init__(self, contract: type | str, trigger: str):
         super().__init__(contract)
         self._trigger = trigger
 
@@ -28,3 +28,13 @@ class ContractIsNotRegistered(DIException):
 class CannotAutomaticallyDeriveContract(DIException):
     def message(self):
         return f'Cannot automatically derive contract: {self.contract}'
+
+
+class CannotImportImplementation(DIException):
+    def message(self):
+        return f'Cannot import implementation: {self.contract}'
+
+
+class CollectionKeyConflict(DIException):
+    def message(self):
+        return f'Positions of unkeyed members clash with explicit keys for contract: {self.contract}'
@@ -1,22 +1,56 @@
 import collections.abc
+import dataclasses
 import functools
+import importlib
 import inspect
+import itertools
+import threading
+import types
 import typing
 
 from ..definition import contracts, exceptions
-from . import resolver
+from . import resolver, teardown
 
 
 class Container:
-    def __init__(self):
+    __slots__ = (
+        '_unit_registry',
+        '_cache',
+        '_unregistered',
+        '_dependents',
+        '_dependencies',
+        '_locks',
+        '_generations',
+        '_resolving',
+        '_member_indexes',
+        '_load_lock',
+        '_loader',
+        '_teardown',
+    )
+
+    def __init__(self, thread_safe: bool = False):
         self._unit_registry: contracts.ContainerUnitRegistry = {}
         self._cache: contracts.InstanceCacheType = {}
+        self._unregistered: contracts.ContractSetType = set()
+        self._dependents: contracts.DependentsRegistryType = {}
+        self._dependencies: contracts.DependenciesRegistryType = {}
+        self._locks: contracts.ConstructionLockRegistryType | None = {} if thread_safe else None
+        self._generations: dict[typing.Hashable, int] = {}
+        self._resolving = False
+        self._member_indexes = itertools.count()
+        self._load_lock = threading.RLock()
+        self._loader: contracts.UnitLoaderType = self._load
+        self._teardown = teardown.Teardown()
 
     def register_dependency(
         self,
         implementation: contracts.ImplementationType,
         contract: contracts.ContractType | None = None,
         cache_scope: typing.Literal['container', 'resolver'] | None = None,
+        multiple: bool = False,
+        key: typing.Hashable | None = None,
+        concurrent: bool = False,
+        lazy: bool = False,
     ):
         if cache_scope == 'container':
             _cache_scope = contracts.CacheScope.CONTAINER
@@ -24,29 +58,37 @@ class Container:
             _cache_scope = contracts.CacheScope.RESOLVER
         else:
             _cache_scope = None
-        contract = self._derive_implementation_contract(implementation, contract)
-        implementation_kind = self._derive_implementation_kind(implementation)
-        implementation_execution_type = self._derive_implementation_execution_type(implementation)
-        init_signature = None
-        execution_signature = None
-        if implementation_kind is contracts.ImplementationKind.CLASS:
-            init_signature = self._derive_parameters(getattr(implementation, '__init__'))
-        elif implementation_kind is contracts.ImplementationKind.CALLABLE:
-            execution_signature = self._derive_parameters(
-                implementation if inspect.isfunction(implementation) else getattr(implementation, '__call__')
+        if multiple and key is None:
+            key = contracts.MemberIndex(next(self._member_indexes))
+        if lazy:
+            if not isinstance(implementation, str):
+                raise TypeError(f'Lazy implementation must be an import string, got: {type(implementation)}')
+            if contract is None:
+                # Deriving the contract would need the import this registration defers
+                raise exceptions.CannotAutomaticallyDeriveContract(implementation)
+            unit = contracts.ContainerUnit(
+                contract=contract,
+                implementation=implementation,
+                implementation_kind=contracts.ImplementationKind.LAZY,
+                cache_scope=_cache_scope,
+                key=key
             )
+        else:
+            unit = self._derive_unit(implementation, contract, _cache_scope, key)
 
-        self._unit_registry[
-            contracts.UnitKey(contract=contract, kind=contracts.UnitKeyKind.DEPENDENCY)
-        ] = contracts.ContainerUnit(
-            contract=contract,
-            implementation=implementation,
-            implementation_kind=implementation_kind,
-            implementation_execution_type=implementation_execution_type,
-            cache_scope=_cache_scope,
-            init_signature=init_signature,
-            execution_signature=execution_signature
-        )
+        if multiple:
+            self._attach_member(unit, concurrent)
+        else:
+            self._attach_dependency(unit)
+
+    def unmaterialized(self) -> list[str]:
+        units: list[contracts.ContainerUnit] = []
+        for unit in self._unit_registry.values():
+            if unit.implementation_kind is contracts.ImplementationKind.COLLECTION:
+                units.extend(unit.members)
+            else:
+                units.append(unit)
+        return [unit.implementation for unit in units if unit.implementation_kind is contracts.ImplementationKind.LAZY]
 
     def register_callback(
         self,
@@ -91,12 +133,15 @@ class Container:
         self,
         *context: typing.Any,
     ) -> resolver.Resolver:
-        _context: collections.abc.MutableMapping = {}
+        self._resolving = True
+        _context: collections.abc.MutableMapping | None = None
 
         for element in context:
             if isinstance(element, collections.abc.Sequence):
                 raise TypeError(f'Unsupported context type: {type(element)}. Use positional arguments instead')
-            elif isinstance(element, collections.abc.Mapping):
+            if _context is None:
+                _context = {}
+            if isinstance(element, collections.abc.Mapping):
                 _context.update(element)
             else:
                 _context[type(element)] = element
@@ -104,20 +149,19 @@ class Container:
         return resolver.Resolver(
             unit_registry=self._unit_registry,
             cache=self._cache,
-            context=_context or None
+            context=_context or None,
+            container_teardown=self._teardown,
+            unregistered=self._unregistered,
+            locks=self._locks,
+            generations=self._generations,
+            loader=self._loader
         )
 
+    async def dispose_stale(self, context: contracts.ShutdownContextType | None = None):
+        await self._teardown.close_detached(context)
+
     async def shutdown(self, context: contracts.ShutdownContextType):
-        for unit_key, unit in self._unit_registry.items():
-            if unit_key.kind == contracts.UnitKeyKind.CALLBACK:
-                if unit.cache_scope is contracts.CacheScope.CONTAINER:
-                    instance = self._cache.get(unit.contract)
-                    if instance is None:
-                        continue
-                    if unit.implementation_execution_type is contracts.ImplementationExecutionType.ASYNC:
-                        await unit.implementation(instance, context)
-                    else:
-                        unit.implementation(instance, context)
+        await self._teardown.close(context)
 
     async def __aenter__(self):
         return self
@@ -133,22 +177,199 @@ class Container:
 
     def __add__(self, other: typing.Self) -> typing.Self:
         for unit in other:
-            if unit.implementation_kind == contracts.ImplementationKind.CALLBACK:
-                unit_key_kind = contracts.UnitKeyKind.CALLBACK
+            if unit.implementation_kind == contracts.ImplementationKind.COLLECTION:
+                for member in unit.members:
+                    if isinstance(member.key, contracts.MemberIndex):
+                        # Indexes are only unique within the container that issued them
+                        member = dataclasses.replace(member, key=contracts.MemberIndex(next(self._member_indexes)))
+                    self._attach_member(member, unit.concurrent)
+                continue
+            elif unit.implementation_kind == contracts.ImplementationKind.CALLBACK:
+                self._unit_registry[
+                    contracts.UnitKey(contract=unit.contract, kind=contracts.UnitKeyKind.CALLBACK)
+                ] = unit
             else:
-                unit_key_kind = contracts.UnitKeyKind.DEPENDENCY
-            self._unit_registry[
-                contracts.UnitKey(contract=unit.contract, kind=unit_key_kind)
-            ] = unit
+                self._attach_dependency(unit)
         return self
 
+    def _derive_unit(
+        self,
+        implementation: contracts.ImplementationType,
+        contract: contracts.ContractType | None,
+        cache_scope: contracts.CacheScope | None,
+        key: typing.Hashable | None
+    ) -> contracts.ContainerUnit:
+        contract = self._derive_implementation_contract(implementation, contract)
+        implementation_kind = self._derive_implementation_kind(implementation)
+        implementation_execution_type = self._derive_implementation_execution_type(implementation)
+        init_signature = None
+        execution_signature = None
+        if implementation_kind is contracts.ImplementationKind.CLASS:
+            init_signature = self._derive_parameters(getattr(implementation, '__init__'))
+        elif implementation_kind in (contracts.ImplementationKind.CALLABLE, contracts.ImplementationKind.GENERATOR):
+            execution_signature = self._derive_parameters(
+                implementation if inspect.isfunction(implementation) else getattr(implementation, '__call__')
+            )
+
+        return contracts.ContainerUnit(
+            contract=contract,
+            implementation=implementation,
+            implementation_kind=implementation_kind,
+            implementation_execution_type=implementation_execution_type,
+            cache_scope=cache_scope,
+            init_signature=init_signature,
+            execution_signature=execution_signature,
+            key=key
+        )
+
+    def _load(
+        self,
+        unit_key: contracts.UnitKey
+    ) -> contracts.ContainerUnit | None:
+        with self._load_lock:
+            if unit_key.kind is contracts.UnitKeyKind.MEMBER:
+                collection = self._unit_registry[
+                    contracts.UnitKey(contract=unit_key.contract, kind=contracts.UnitKeyKind.COLLECTION)
+                ]
+                for index, member in enumerate(collection.members):
+                    if member.key == unit_key.key:
+                        if member.implementation_kind is contracts.ImplementationKind.LAZY:
+                            # A placeholder has never been built, so there is nothing to invalidate,
+                            # and invalidating would evict the instance being constructed right now
+                            member = self._materialize(member)
+                            collection.members = (
+                                *collection.members[:index], member, *collection.members[index + 1:]
+                            )
+                            self._track_dependencies(member, unit_key)
+                        return member
+                return None
+
+            if (unit := self._unit_registry.get(unit_key)) is not None and (
+                unit.implementation_kind is contracts.ImplementationKind.LAZY
+            ):
+                self._unit_registry[unit_key] = unit = self._materialize(unit)
+                self._track_dependencies(unit, unit.contract)
+            return unit
+
+    def _materialize(
+        self,
+        unit: contracts.ContainerUnit
+    ) -> contracts.ContainerUnit:
+        module_name, _, qualname = unit.implementation.partition(':')
+        try:
+            implementation = functools.reduce(getattr, qualname.split('.'), importlib.import_module(module_name))
+        except (ImportError, AttributeError) as e:
+            raise exceptions.CannotImportImplementation(unit.implementation) from e
+        return self._derive_unit(implementation, unit.contract, unit.cache_scope, unit.key)
+
+    def _attach_dependency(
+        self,
+        unit: contracts.ContainerUnit
+    ):
+        self._unregistered.discard(unit.contract)
+        self._unit_registry[
+            contracts.UnitKey(contract=unit.contract, kind=contracts.UnitKeyKind.DEPENDENCY)
+        ] = unit
+        self._track_dependencies(unit, unit.contract)
+        self._invalidate(unit.contract)
+
+    def _attach_member(
+        self,
+        unit: contracts.ContainerUnit,
+        concurrent: bool = False
+    ):
+        collection_key = contracts.UnitKey(contract=unit.contract, kind=contracts.UnitKeyKind.COLLECTION)
+        if (collection := self._unit_registry.get(collection_key)) is None:
+            collection = contracts.ContainerUnit(
+                contract=unit.contract,
+                implementation=None,
+                implementation_kind=contracts.ImplementationKind.COLLECTION,
+            )
+            self._unit_registry[collection_key] = collection
+        collection.concurrent = collection.concurrent or concurrent
+
+        # Members are replaced rather than mutated, resolvers may be iterating the current ones
+        for index, member in enumerate(collection.members):
+            if member.key == unit.key:
+                collection.members = (*collection.members[:index], unit, *collection.members[index + 1:])
+                break
+        else:
+            collection.members = (*collection.members, unit)
+
+        cache_key = contracts.UnitKey(contract=unit.contract, kind=contracts.UnitKeyKind.MEMBER, key=unit.key)
+        self._track_dependencies(unit, cache_key)
+        self._invalidate(cache_key)
+
+    def _track_dependencies(
+        self,
+        unit: contracts.ContainerUnit,
+        cache_key: typing.Hashable
+    ):
+        for contract in self._dependencies.pop(cache_key, ()):
+            self._dependents[contract].discard(cache_key)
+
+        dependencies = {
+            contract
+            for signature in (unit.init_signature, unit.execution_signature) if signature is not None
+            for parameter in signature.parameters.values()
+            for contract in (parameter.contract, parameter.member) if contract is not None
+        }
+        for contract in dependencies:
+            self._dependents.setdefault(contract, set()).add(cache_key)
+        if dependencies:
+            self._dependencies[cache_key] = dependencies
+
+    def _invalidate(
+        self,
+        cache_key: typing.Hashable
+    ):
+        if not self._cache and not self._resolving:
+            return
+        pending = [cache_key]
+        invalidated = set()
+        while pending:
+            cache_key = pending.pop()
+            if cache_key in invalidated:
+                continue
+            invalidated.add(cache_key)
+            self._evict(cache_key)
+            contract = cache_key.contract if isinstance(cache_key, contracts.UnitKey) else cache_key
+            pending.extend(self._dependents.get(contract, ()))
+
+    def _evict(
+        self,
+        cache_key: typing.Hashable
+    ):
+        lock = self._locks.get(cache_key) if self._locks is not None else None
+        if lock is not None and not lock.acquire(blocking=False):
+            # A construction is in flight and may belong to a suspended task of this thread, so do not wait:
+            # the generation bump below makes it drop its instance before releasing the lock
+            lock = None
+        try:
+            self._generations[cache_key] = self._generations.get(cache_key, 0) + 1
+            self._cache.pop(cache_key, None)
+            self._teardown.detach(cache_key)
+        finally:
+            if lock is not None:
+                lock.release()
+
     @staticmethod
     def _derive_implementation_contract(
         implementation: contracts.ImplementationType,
         contract: contracts.ContractType | None = None
     ) -> contracts.ContractType:
         if contract is None:
-            if inspect.isfunction(implementation):
+            if inspect.isgeneratorfunction(implementation) or inspect.isasyncgenfunction(implementation):
+                signature = inspect.signature(implementation)
+                if typing.get_origin(signature.return_annotation) in (
+                    collections.abc.Generator,
+                    collections.abc.Iterator,
+                    collections.abc.AsyncGenerator,
+                    collections.abc.AsyncIterator,
+                ):
+                    return typing.get_args(signature.return_annotation)[0]
+                raise exceptions.CannotAutomaticallyDeriveContract(implementation)
+            elif inspect.isfunction(implementation):
                 signature = inspect.signature(implementation)
                 return signature.return_annotation
             elif inspect.isclass(implementation):
@@ -160,8 +381,9 @@ class Container:
                 raise exceptions.CannotAutomaticallyDeriveContract(implementation)
         return contract
 
-    @staticmethod
+    @classmethod
     def _derive_parameters(
+        cls,
         func: typing.Callable
     ):
         if not inspect.isfunction(func):
@@ -169,24 +391,46 @@ class Container:
         signature = inspect.signature(func)
         return contracts.FunctionSignature(
             parameters={
-                param_name: contracts.FunctionParameter(
-                    name=param_name,
-                    type=param_type.annotation,
-                    default=None if param_type.default is inspect.Parameter.empty else param_type.default
-                )
-                for param_name, param_type
+                param_name: cls._derive_parameter(param)
+                for param_name, param
                 in signature.parameters.items()
                 if param_name != 'self'
             },
             result=signature.return_annotation
         )
 
+    @staticmethod
+    def _derive_parameter(
+        param: inspect.Parameter
+    ) -> contracts.FunctionParameter:
+        contract = param.annotation
+        member = None
+        collection: type[list] | type[dict] | None = None
+        if typing.get_origin(contract) in (typing.Union, types.UnionType):
+            args = [arg for arg in typing.get_args(contract) if arg is not types.NoneType]
+            # Ambiguous unions can only be satisfied by name from the resolve context
+            contract = args[0] if len(args) == 1 else None
+        if typing.get_origin(contract) is list:
+            member, collection = typing.get_args(contract)[0], list
+        elif typing.get_origin(contract) is dict:
+            member, collection = typing.get_args(contract)[1], dict
+        return contracts.FunctionParameter(
+            name=param.name,
+            type=param.annotation,
+            default=None if param.default is inspect.Parameter.empty else param.default,
+            contract=contract,
+            member=member,
+            collection=collection
+        )
+
     @staticmethod
     def _derive_implementation_kind(
         implementation: contracts.ImplementationType
     ) -> contracts.ImplementationKind:
         if inspect.isclass(implementation):
             return contracts.ImplementationKind.CLASS
+        elif inspect.isgeneratorfunction(implementation) or inspect.isasyncgenfunction(implementation):
+            return contracts.ImplementationKind.GENERATOR
         elif inspect.iscoroutinefunction(implementation):
             return contracts.ImplementationKind.CALLABLE
         elif inspect.isfunction(implementation):
@@ -200,7 +444,7 @@ class Container:
     def _derive_implementation_execution_type(
         implementation: contracts.ImplementationType
     ):
-        if inspect.iscoroutinefunction(implementation):
+        if inspect.iscoroutinefunction(implementation) or inspect.isasyncgenfunction(implementation):
             return contracts.ImplementationExecutionType.ASYNC
         elif inspect.isfunction(implementation):
             return contracts.ImplementationExecutionType.SYNC
@@ -1,26 +1,65 @@
+import asyncio
+import threading
 import types
 import typing
 
-from ..definition import contracts
+from ..definition import contracts, exceptions
+from . import teardown
+
+_EMPTY_CONTEXT: contracts.ResolverContextType = types.MappingProxyType({})
+_NO_GENERATIONS: contracts.GenerationRegistryType = types.MappingProxyType({})
+_MISSING = object()
 
 
 class Resolver:
+    __slots__ = (
+        '_unit_registry',
+        '_container_cache',
+        '_unregistered',
+        '_locks',
+        '_generations',
+        '_loader',
+        '_in_flight',
+        '_resolver_cache',
+        '_resolver_context',
+        '_container_teardown',
+        '_resolver_teardown',
+    )
+
     def __init__(
         self,
         unit_registry: contracts.ContainerUnitRegistry,
         cache: contracts.InstanceCacheType | None = None,
-        context: contracts.ResolverContextType | None = None
+        context: contracts.ResolverContextType | None = None,
+        container_teardown: teardown.Teardown | None = None,
+        unregistered: contracts.ContractSetType | None = None,
+        locks: contracts.ConstructionLockRegistryType | None = None,
+        generations: contracts.GenerationRegistryType | None = None,
+        loader: contracts.UnitLoaderType | None = None
     ):
         self._unit_registry = unit_registry
         self._container_cache: contracts.InstanceCacheType = cache if cache is not None else {}
-        self._resolver_cache: contracts.InstanceCacheType = {}
-        self._resolver_context = context or {}
+        self._unregistered: contracts.ContractSetType = unregistered if unregistered is not None else set()
+        self._locks = locks
+        self._generations = generations if generations is not None else _NO_GENERATIONS
+        self._loader = loader
+        self._in_flight: dict[typing.Hashable, asyncio.Future] | None = None
+        self._resolver_cache: contracts.InstanceCacheType | None = None
+        self._resolver_context = context or None
+        self._container_teardown = container_teardown
+        self._resolver_teardown: teardown.Teardown | None = None
 
     async def resolve(
         self,
         contract: contracts.ContractType,
         context: contracts.ResolverContextType | None = None
     ):
+        if (collection := typing.get_origin(contract)) in (list, dict) and not self._is_bound(contract):
+            return await self._resolve_collection(
+                contract=typing.get_args(contract)[-1],
+                collection=collection,
+                context=context
+            )
         return await self._resolve(
             contract=contract,
             context=context
@@ -30,16 +69,9 @@ class Resolver:
         self,
         context: contracts.ShutdownContextType | None = None
     ):
-        for unit_key, unit in self._unit_registry.items():
-            if unit_key.kind == contracts.UnitKeyKind.CALLBACK:
-                if unit.cache_scope is contracts.CacheScope.RESOLVER:
-                    instance = self._resolver_cache.get(unit.contract)
-                    if instance is None:
-                        continue
-                    if unit.implementation_execution_type is contracts.ImplementationExecutionType.ASYNC:
-                        await unit.implementation(instance, context)
-                    else:
-                        unit.implementation(instance, context)
+        if self._resolver_teardown is None:
+            return
+        await self._resolver_teardown.close(context)
 
     async def __aenter__(self):
         return self
@@ -55,23 +87,147 @@ class Resolver:
         default: typing.Any | None = None,
         context: contracts.ResolverContextType | None = None
     ):
-
-        if contract in self._resolver_context:
-            return self._resolver_context.get(contract)
-        if contract in self._resolver_cache:
-            return self._resolver_cache.get(contract)
-        if contract in self._container_cache:
-            return self._container_cache.get(contract)
+        if self._resolver_context is not None and contract in self._resolver_context:
+            return self._resolver_context[contract]
+        if contract in self._unregistered:
+            return default
         if (
-            unit := self._unit_registry.get(
-                contracts.UnitKey(
-                    contract=contract,
-                    kind=contracts.UnitKeyKind.DEPENDENCY)
-            )
-        ) is None:
+            self._resolver_cache is not None
+            and (result := self._resolver_cache.get(contract, _MISSING)) is not _MISSING
+        ):
+            return result
+        if (result := self._container_cache.get(contract, _MISSING)) is not _MISSING:
+            return result
+        unit_key = contracts.UnitKey(contract=contract, kind=contracts.UnitKeyKind.DEPENDENCY)
+        if (unit := self._unit_registry.get(unit_key)) is None:
+            self._unregistered.add(contract)
             return default
+        if unit.implementation_kind is contracts.ImplementationKind.LAZY:
+            unit = self._load(unit, unit_key)
+        return await self._create(unit, contract, context)
+
+    async def _resolve_collection(
+        self,
+        contract: contracts.ContractType,
+        collection: type[list] | type[dict],
+        default: typing.Any | None = None,
+        context: contracts.ResolverContextType | None = None
+    ):
+        unit_key = contracts.UnitKey(contract=contract, kind=contracts.UnitKeyKind.COLLECTION)
+        if (unit := self._unit_registry.get(unit_key)) is None:
+            return collection() if default is None else default
+
+        if unit.concurrent:
+            if self._in_flight is None:
+                # Members built side by side may share scoped dependencies, which must be constructed once
+                self._in_flight = {}
+            instances = await asyncio.gather(*(self._resolve_member(member, context) for member in unit.members))
+        else:
+            instances = [await self._resolve_member(member, context) for member in unit.members]
+
+        if collection is dict:
+            result = {
+                index if isinstance(member.key, contracts.MemberIndex) else member.key: instance
+                for index, (member, instance) in enumerate(zip(unit.members, instances))
+            }
+            if len(result) != len(instances):
+                raise exceptions.CollectionKeyConflict(contract)
+            return result
+        return instances
+
+    async def _resolve_member(
+        self,
+        unit: contracts.ContainerUnit,
+        context: contracts.ResolverContextType | None = None
+    ):
+        if unit.implementation_kind is contracts.ImplementationKind.LAZY:
+            unit = self._load(
+                unit, contracts.UnitKey(contract=unit.contract, kind=contracts.UnitKeyKind.MEMBER, key=unit.key)
+            )
+        if unit.cache_scope is None:
+            return await self._create(unit, None, context)
+
+        cache_key = contracts.UnitKey(contract=unit.contract, kind=contracts.UnitKeyKind.MEMBER, key=unit.key)
+        if (
+            self._resolver_cache is not None
+            and (result := self._resolver_cache.get(cache_key, _MISSING)) is not _MISSING
+        ):
+            return result
+        if (result := self._container_cache.get(cache_key, _MISSING)) is not _MISSING:
+            return result
+        return await self._create(unit, cache_key, context)
+
+    async def _create(
+        self,
+        unit: contracts.ContainerUnit,
+        cache_key: typing.Hashable,
+        context: contracts.ResolverContextType | None = None
+    ):
+        if self._in_flight is not None and unit.cache_scope is not None:
+            return await self._create_shared(unit, cache_key, self._in_flight, context)
+        return await self._create_exclusive(unit, cache_key, context)
+
+    async def _create_shared(
+        self,
+        unit: contracts.ContainerUnit,
+        cache_key: typing.Hashable,
+        in_flight: dict[typing.Hashable, asyncio.Future],
+        context: contracts.ResolverContextType | None = None
+    ):
+        if (future := in_flight.get(cache_key)) is not None:
+            return await asyncio.shield(future)
+
+        future = in_flight[cache_key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._create_exclusive(unit, cache_key, context)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters are optional, do not report the exception as never retrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del in_flight[cache_key]
 
-        context = context or {}
+    async def _create_exclusive(
+        self,
+        unit: contracts.ContainerUnit,
+        cache_key: typing.Hashable,
+        context: contracts.ResolverContextType | None = None
+    ):
+        if unit.cache_scope is not contracts.CacheScope.CONTAINER or self._locks is None:
+            return await self._construct(unit, cache_key, context)
+
+        lock = self._locks.get(cache_key) or self._locks.setdefault(cache_key, threading.Lock())
+        await self._acquire(lock)
+        try:
+            if (result := self._container_cache.get(cache_key, _MISSING)) is not _MISSING:
+                return result
+            return await self._construct(unit, cache_key, context)
+        finally:
+            lock.release()
+
+    @staticmethod
+    async def _acquire(lock: threading.Lock):
+        # Never block the thread: the owner may be another task of this event loop
+        delay = 0.0
+        while not lock.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2 or 0.00005, 0.005)
+
+    async def _construct(
+        self,
+        unit: contracts.ContainerUnit,
+        cache_key: typing.Hashable,
+        context: contracts.ResolverContextType | None = None
+    ):
+        context = context or _EMPTY_CONTEXT
+        generation = self._generations.get(cache_key, 0)
         result = None
         if unit.implementation_kind is contracts.ImplementationKind.STATIC:
             result = unit.implementation
@@ -91,31 +247,90 @@ class Resolver:
                 result = await unit.implementation(**params)
             else:
                 result = unit.implementation(**params)
+        elif unit.implementation_kind is contracts.ImplementationKind.GENERATOR:
+            params = {
+                parameter.name: await self._apply_context_parameter(parameter, context)
+                for parameter in unit.execution_signature.parameters.values()
+            } if unit.execution_signature else {}
+            if unit.implementation_execution_type is contracts.ImplementationExecutionType.ASYNC:
+                result = await self._get_teardown(unit).enter_async_generator(
+                    unit.implementation, params, self._get_teardown_key(unit, cache_key)
+                )
+            else:
+                result = self._get_teardown(unit).enter_generator(
+                    unit.implementation, params, self._get_teardown_key(unit, cache_key)
+                )
+
+        if unit.cache_scope is not None and (
+            callback_unit := self._unit_registry.get(
+                contracts.UnitKey(
+                    contract=unit.contract,
+                    kind=contracts.UnitKeyKind.CALLBACK)
+            )
+        ) is not None and result is not None:
+            self._get_teardown(unit).push_callback(callback_unit, result, self._get_teardown_key(unit, cache_key))
 
-        if result is not None:
-            if unit.cache_scope is contracts.CacheScope.RESOLVER:
-                self._resolver_cache[contract] = result
-            elif unit.cache_scope is contracts.CacheScope.CONTAINER:
-                self._container_cache[contract] = result
+        if unit.cache_scope is contracts.CacheScope.CONTAINER and self._generations.get(cache_key, 0) != generation:
+            # Invalidated while being constructed, keep the stale instance and its resources out of the container
+            if self._container_teardown is not None:
+                self._container_teardown.detach(cache_key)
+        elif unit.cache_scope is contracts.CacheScope.RESOLVER:
+            if self._resolver_cache is None:
+                self._resolver_cache = {}
+            self._resolver_cache[cache_key] = result
+        elif unit.cache_scope is contracts.CacheScope.CONTAINER:
+            self._container_cache[cache_key] = result
 
         return result
 
+    def _load(
+        self,
+        unit: contracts.ContainerUnit,
+        unit_key: contracts.UnitKey
+    ) -> contracts.ContainerUnit:
+        # Only the container can swap a placeholder for the imported unit
+        if self._loader is None or (loaded := self._loader(unit_key)) is None:
+            raise exceptions.CannotImportImplementation(unit.implementation)
+        return loaded
+
+    def _get_teardown(self, unit: contracts.ContainerUnit) -> teardown.Teardown:
+        if unit.cache_scope is contracts.CacheScope.CONTAINER and self._container_teardown is not None:
+            return self._container_teardown
+        if self._resolver_teardown is None:
+            self._resolver_teardown = teardown.Teardown()
+        return self._resolver_teardown
+
+    @staticmethod
+    def _get_teardown_key(unit: contracts.ContainerUnit, cache_key: typing.Hashable) -> typing.Hashable | None:
+        # Container scoped resources are kept apart so they can be released on invalidation
+        return cache_key if unit.cache_scope is contracts.CacheScope.CONTAINER else None
+
+    def _is_bound(self, contract: contracts.ContractType) -> bool:
+        return (
+            self._resolver_context is not None and contract in self._resolver_context
+        ) or contracts.UnitKey(contract=contract, kind=contracts.UnitKeyKind.DEPENDENCY) in self._unit_registry
+
     async def _apply_context_parameter(
         self,
         parameter: contracts.FunctionParameter,
         context: contracts.ResolverContextType
     ):
-        args = list(filter(lambda x: x is not types.NoneType, typing.get_args(parameter.type)))
-        if len(args) > 1:
+        if parameter.contract is None:
+            if parameter.name in context:
+                return context.get(parameter.name)
             raise Exception("Cannot resolve more than 1 contract")
-        elif len(args) == 1:
-            _type = args[0]
-        else:
-            _type = parameter.type
+        elif (
+            parameter.member is not None
+            and parameter.collection is not None
+            and not self._is_bound(parameter.contract)
+        ):
+            if parameter.name in context:
+                return context.get(parameter.name)
+            return await self._resolve_collection(parameter.member, parameter.collection, parameter.default)
 
-        if _type in context:
-            return context.get(_type)
+        if parameter.contract in context:
+            return context.get(parameter.contract)
         elif parameter.name in context:
             return context.get(parameter.name)
         else:
-            return await self._resolve(_type, parameter.default)
+            return await self._resolve(parameter.contract, parameter.default)
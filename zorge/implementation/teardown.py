@@ -0,0 +1,94 @@
+import collections.abc
+import contextlib
+import typing
+
+from ..definition import contracts
+
+
+class Teardown:
+    __slots__ = ('_exit_stack', '_keyed_exit_stacks', '_detached_exit_stacks', '_context')
+
+    def __init__(self):
+        self._exit_stack = contextlib.AsyncExitStack()
+        self._keyed_exit_stacks: dict[typing.Hashable, contextlib.AsyncExitStack] | None = None
+        self._detached_exit_stacks: list[contextlib.AsyncExitStack] | None = None
+        self._context: contracts.ShutdownContextType | None = None
+
+    def enter_generator(
+        self,
+        factory: collections.abc.Callable[..., collections.abc.Generator],
+        params: collections.abc.Mapping[str, typing.Any],
+        key: typing.Hashable | None = None
+    ) -> contracts.InstanceType:
+        return self._get_exit_stack(key).enter_context(contextlib.contextmanager(factory)(**params))
+
+    async def enter_async_generator(
+        self,
+        factory: collections.abc.Callable[..., collections.abc.AsyncGenerator],
+        params: collections.abc.Mapping[str, typing.Any],
+        key: typing.Hashable | None = None
+    ) -> contracts.InstanceType:
+        return await self._get_exit_stack(key).enter_async_context(
+            contextlib.asynccontextmanager(factory)(**params)
+        )
+
+    def push_callback(
+        self,
+        unit: contracts.ContainerUnit,
+        instance: contracts.InstanceType,
+        key: typing.Hashable | None = None
+    ):
+        self._get_exit_stack(key).push_async_callback(self._execute_callback, unit, instance)
+
+    def detach(self, key: typing.Hashable):
+        if self._keyed_exit_stacks is None or (exit_stack := self._keyed_exit_stacks.pop(key, None)) is None:
+            return
+        if self._detached_exit_stacks is None:
+            self._detached_exit_stacks = []
+        self._detached_exit_stacks.append(exit_stack)
+
+    async def close_detached(self, context: contracts.ShutdownContextType | None = None):
+        if not self._detached_exit_stacks:
+            return
+        detached_exit_stacks, self._detached_exit_stacks = self._detached_exit_stacks, None
+        self._context = context
+        try:
+            async with contextlib.AsyncExitStack() as exit_stack:
+                for detached_exit_stack in detached_exit_stacks:
+                    exit_stack.push_async_callback(detached_exit_stack.aclose)
+        finally:
+            self._context = None
+
+    async def close(self, context: contracts.ShutdownContextType | None = None):
+        self._context = context
+        try:
+            async with contextlib.AsyncExitStack() as exit_stack:
+                # Pushed in creation order so the latest stacks, which may depend on earlier ones, close first
+                exit_stack.push_async_callback(self._exit_stack.aclose)
+                for detached_exit_stack in self._detached_exit_stacks or ():
+                    exit_stack.push_async_callback(detached_exit_stack.aclose)
+                for keyed_exit_stack in (self._keyed_exit_stacks or {}).values():
+                    exit_stack.push_async_callback(keyed_exit_stack.aclose)
+        finally:
+            self._keyed_exit_stacks = None
+            self._detached_exit_stacks = None
+            self._context = None
+
+    def _get_exit_stack(self, key: typing.Hashable | None) -> contextlib.AsyncExitStack:
+        if key is None:
+            return self._exit_stack
+        if self._keyed_exit_stacks is None:
+            self._keyed_exit_stacks = {}
+        if (exit_stack := self._keyed_exit_stacks.get(key)) is None:
+            exit_stack = self._keyed_exit_stacks[key] = contextlib.AsyncExitStack()
+        return exit_stack
+
+    async def _execute_callback(
+        self,
+        unit: contracts.ContainerUnit,
+        instance: contracts.InstanceType
+    ):
+        if unit.implementation_execution_type is contracts.ImplementationExecutionType.ASYNC:
+            await unit.implementation(instance, self._context)
+        else:
+            unit.implementation(instance, self._context)